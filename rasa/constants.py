@@ -73,3 +73,4 @@ DEFAULT_CARRY_OVER_SLOTS_TO_NEW_SESSION = True
 ENV_GPU_CONFIG = "TF_GPU_MEMORY_ALLOC"
 ENV_CPU_INTER_OP_CONFIG = "TF_INTER_OP_PARALLELISM_THREADS"
 ENV_CPU_INTRA_OP_CONFIG = "TF_INTRA_OP_PARALLELISM_THREADS"
+ENV_XLA_JIT_CONFIG = "TF_XLA_JIT"
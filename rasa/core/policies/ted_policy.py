@@ -5,7 +5,6 @@ from pathlib import Path
 
 import numpy as np
 import tensorflow as tf
-import tensorflow_addons as tfa
 
 from typing import Any, List, Optional, Text, Dict, Tuple, Union
 
@@ -569,6 +568,7 @@ class TED(RasaModel):
 
     def _emebed_dialogue(self, dialogue_in: tf.Tensor) -> Tuple[tf.Tensor, tf.Tensor]:
         """Create dialogue level embedding and mask."""
+        import tensorflow_addons as tfa
 
         # mask different length sequences
         # if there is at least one `-1` it should be masked
@@ -4,9 +4,8 @@ from pathlib import Path
 
 import numpy as np
 import os
-import scipy.sparse
 import tensorflow as tf
-import tensorflow_addons as tfa
+import typing
 
 from typing import Any, Dict, List, Optional, Text, Tuple, Union, Type, NamedTuple
 
@@ -17,7 +16,7 @@ from rasa.nlu.featurizers.featurizer import Featurizer
 from rasa.nlu.components import Component
 from rasa.nlu.classifiers.classifier import IntentClassifier
 from rasa.nlu.extractors.extractor import EntityExtractor
-from rasa.nlu.test import determine_token_labels
+from rasa.nlu.test import determine_labels_for_tokens
 from rasa.nlu.classifiers import LABEL_RANKING_LENGTH
 from rasa.utils import train_utils
 from rasa.utils.tensorflow import layers
@@ -86,6 +85,9 @@ from rasa.utils.tensorflow.constants import (
     TENSORBOARD_LOG_LEVEL,
 )
 
+if typing.TYPE_CHECKING:
+    import scipy.sparse
+
 
 logger = logging.getLogger(__name__)
 
@@ -340,6 +342,20 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
     def _invert_mapping(mapping: Dict) -> Dict:
         return {value: key for key, value in mapping.items()}
 
+    @staticmethod
+    def _as_object_array(values: List[Any]) -> np.ndarray:
+        """Create an array of objects with one entry per value.
+
+        Unlike `np.array(values)`, numpy doesn't need to check whether the values
+        share a common shape and doesn't copy them into one dense block.
+        """
+
+        array = np.empty(len(values), dtype=object)
+        for idx, value in enumerate(values):
+            array[idx] = value
+
+        return array
+
     def _create_entity_tag_specs(
         self, training_data: TrainingData
     ) -> List[EntityTagSpec]:
@@ -396,13 +412,15 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
         return tag_id_dict
 
     @staticmethod
-    def _find_example_for_label(
-        label: Text, examples: List[Message], attribute: Text
-    ) -> Optional[Message]:
+    def _first_example_per_label(
+        examples: List[Message], attribute: Text
+    ) -> Dict[Text, Message]:
+        """Collect the first example of every label in a single pass."""
+
+        label_examples = {}
         for ex in examples:
-            if ex.get(attribute) == label:
-                return ex
-        return None
+            label_examples.setdefault(ex.get(attribute), ex)
+        return label_examples
 
     @staticmethod
     def _check_labels_features_exist(
@@ -418,15 +436,9 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
 
     def _extract_features(
         self, message: Message, attribute: Text
-    ) -> Tuple[Optional[scipy.sparse.spmatrix], Optional[np.ndarray]]:
-        sparse_features = None
-        dense_features = None
-
-        if message.get(SPARSE_FEATURE_NAMES[attribute]) is not None:
-            sparse_features = message.get(SPARSE_FEATURE_NAMES[attribute])
-
-        if message.get(DENSE_FEATURE_NAMES[attribute]) is not None:
-            dense_features = message.get(DENSE_FEATURE_NAMES[attribute])
+    ) -> Tuple[Optional["scipy.sparse.spmatrix"], Optional[np.ndarray]]:
+        sparse_features = message.get(SPARSE_FEATURE_NAMES[attribute])
+        dense_features = message.get(DENSE_FEATURE_NAMES[attribute])
 
         if sparse_features is not None and dense_features is not None:
             if sparse_features.shape[0] != dense_features.shape[0]:
@@ -478,8 +490,8 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
             if _dense is not None:
                 dense_features.append(_dense)
 
-        sparse_features = np.array(sparse_features)
-        dense_features = np.array(dense_features)
+        sparse_features = self._as_object_array(sparse_features)
+        dense_features = self._as_object_array(dense_features)
 
         return [sparse_features, dense_features]
 
@@ -489,9 +501,11 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
     ) -> List[np.ndarray]:
         """Computes one-hot representation for the labels."""
 
-        eye_matrix = np.eye(len(labels_example), dtype=np.float32)
+        # one-hot values are exact in half precision, batches are converted to
+        # float32 when they are padded in `RasaModelData.prepare_batch`
+        eye_matrix = np.eye(len(labels_example), dtype=np.float16)
         # add sequence dimension to one-hot labels
-        return [np.array([np.expand_dims(a, 0) for a in eye_matrix])]
+        return [eye_matrix[:, np.newaxis, :]]
 
     def _create_label_data(
         self,
@@ -508,12 +522,13 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
         """
 
         # Collect one example for each label
-        labels_idx_examples = []
-        for label_name, idx in label_id_dict.items():
-            label_example = self._find_example_for_label(
-                label_name, training_data.intent_examples, attribute
-            )
-            labels_idx_examples.append((idx, label_example))
+        label_examples = self._first_example_per_label(
+            training_data.intent_examples, attribute
+        )
+        labels_idx_examples = [
+            (idx, label_examples.get(label_name))
+            for label_name, idx in label_id_dict.items()
+        ]
 
         # Sort the list of tuples based on label_idx
         labels_idx_examples = sorted(labels_idx_examples, key=lambda x: x[0])
@@ -541,7 +556,8 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
 
     def _use_default_label_features(self, label_ids: np.ndarray) -> List[np.ndarray]:
         all_label_features = self._label_data.get(LABEL_FEATURES)[0]
-        return [np.array([all_label_features[label_id] for label_id in label_ids])]
+        # `label_ids` might be empty and therefore of float type
+        return [all_label_features[label_ids.astype(np.int64)]]
 
     def _create_model_data(
         self,
@@ -559,8 +575,17 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
         label_ids = []
         tag_name_to_tag_ids = defaultdict(list)
 
+        # only add tag_ids during training
+        entity_tag_specs = (
+            self._entity_tag_specs
+            if training and self.component_config.get(ENTITY_RECOGNITION)
+            else []
+        )
+
         for example in training_data:
-            if label_attribute is None or example.get(label_attribute):
+            label = example.get(label_attribute)
+
+            if label_attribute is None or label:
                 _sparse, _dense = self._extract_features(example, TEXT)
                 if _sparse is not None:
                     X_sparse.append(_sparse)
@@ -568,7 +593,7 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
                     X_dense.append(_dense)
 
             # only add features for intent labels during training
-            if training and example.get(label_attribute):
+            if training and label:
                 _sparse, _dense = self._extract_features(example, label_attribute)
                 if _sparse is not None:
                     Y_sparse.append(_sparse)
@@ -576,22 +601,20 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
                     Y_dense.append(_dense)
 
                 if label_id_dict:
-                    label_ids.append(label_id_dict[example.get(label_attribute)])
+                    label_ids.append(label_id_dict[label])
 
-            # only add tag_ids during training
-            if training and self.component_config.get(ENTITY_RECOGNITION):
-                for tag_spec in self._entity_tag_specs:
-                    tag_name_to_tag_ids[tag_spec.tag_name].append(
-                        self._tag_ids_for_crf(example, tag_spec)
-                    )
+            for tag_spec in entity_tag_specs:
+                tag_name_to_tag_ids[tag_spec.tag_name].append(
+                    self._tag_ids_for_crf(example, tag_spec)
+                )
 
-        X_sparse = np.array(X_sparse)
-        X_dense = np.array(X_dense)
-        Y_sparse = np.array(Y_sparse)
-        Y_dense = np.array(Y_dense)
+        X_sparse = self._as_object_array(X_sparse)
+        X_dense = self._as_object_array(X_dense)
+        Y_sparse = self._as_object_array(Y_sparse)
+        Y_dense = self._as_object_array(Y_dense)
         label_ids = np.array(label_ids)
         tag_name_to_tag_ids = {
-            tag_name: np.array(tag_ids)
+            tag_name: self._as_object_array(tag_ids)
             for tag_name, tag_ids in tag_name_to_tag_ids.items()
         }
 
@@ -619,19 +642,27 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
     def _tag_ids_for_crf(self, example: Message, tag_spec: EntityTagSpec) -> np.ndarray:
         """Create a np.array containing the tag ids of the given message."""
         if self.component_config[BILOU_FLAG]:
-            _tags = bilou_utils.bilou_tags_to_ids(
-                example, tag_spec.tags_to_ids, tag_spec.tag_name
+            _tags = np.array(
+                bilou_utils.bilou_tags_to_ids(
+                    example, tag_spec.tags_to_ids, tag_spec.tag_name
+                ),
+                dtype=np.int64,
             )
         else:
-            _tags = []
-            for token in example.get(TOKENS_NAMES[TEXT]):
-                _tag = determine_token_labels(
-                    token, example.get(ENTITIES), attribute_key=tag_spec.tag_name
-                )
-                _tags.append(tag_spec.tags_to_ids[_tag])
+            tokens = example.get(TOKENS_NAMES[TEXT])
+            _tags = np.fromiter(
+                (
+                    tag_spec.tags_to_ids[_tag]
+                    for _tag in determine_labels_for_tokens(
+                        tokens, example.get(ENTITIES), attribute_key=tag_spec.tag_name
+                    )
+                ),
+                dtype=np.int64,
+                count=len(tokens),
+            )
 
-        # transpose to have seq_len x 1
-        return np.array([_tags]).T
+        # add last dimension to have seq_len x 1
+        return _tags[:, np.newaxis]
 
     # train helpers
     def preprocess_train_data(self, training_data: TrainingData) -> RasaModelData:
@@ -753,7 +784,21 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
 
         message_sim = message_sim.flatten()  # sim is a matrix
 
-        label_ids = message_sim.argsort()[::-1]
+        if (
+            self.component_config[RANKING_LENGTH]
+            and 0 < self.component_config[RANKING_LENGTH] < LABEL_RANKING_LENGTH
+        ):
+            output_length = self.component_config[RANKING_LENGTH]
+        else:
+            output_length = LABEL_RANKING_LENGTH
+
+        # only the top `output_length` labels are reported, so partition the
+        # similarities instead of sorting all of them
+        if output_length < message_sim.size:
+            label_ids = np.argpartition(-message_sim, output_length)[:output_length]
+        else:
+            label_ids = np.arange(message_sim.size)
+        label_ids = label_ids[np.argsort(-message_sim[label_ids], kind="stable")]
 
         if (
             self.component_config[LOSS_TYPE] == SOFTMAX
@@ -763,26 +808,16 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
                 message_sim, self.component_config[RANKING_LENGTH]
             )
 
-        message_sim[::-1].sort()
-        message_sim = message_sim.tolist()
+        scores = message_sim[label_ids].tolist()
 
         # if X contains all zeros do not predict some label
         if label_ids.size > 0:
             label = {
                 "name": self.index_label_id_mapping[label_ids[0]],
-                "confidence": message_sim[0],
+                "confidence": scores[0],
             }
 
-            if (
-                self.component_config[RANKING_LENGTH]
-                and 0 < self.component_config[RANKING_LENGTH] < LABEL_RANKING_LENGTH
-            ):
-                output_length = self.component_config[RANKING_LENGTH]
-            else:
-                output_length = LABEL_RANKING_LENGTH
-
-            ranking = list(zip(list(label_ids), message_sim))
-            ranking = ranking[:output_length]
+            ranking = zip(label_ids.tolist(), scores)
             label_ranking = [
                 {"name": self.index_label_id_mapping[label_idx], "confidence": score}
                 for label_idx, score in ranking
@@ -814,7 +849,8 @@ class DIETClassifier(IntentClassifier, EntityExtractor):
 
         for tag_spec in self._entity_tag_specs:
             predictions = predict_out[f"e_{tag_spec.tag_name}_ids"].numpy()
-            tags = [tag_spec.ids_to_tags[p] for p in predictions[0]]
+            # convert to python ints once to avoid hashing numpy scalars per token
+            tags = [tag_spec.ids_to_tags[p] for p in predictions[0].tolist()]
 
             if self.component_config[BILOU_FLAG]:
                 tags = bilou_utils.ensure_consistent_bilou_tagging(tags)
@@ -1229,9 +1265,6 @@ class DIET(RasaModel):
                 max_relative_position=self.config[MAX_RELATIVE_POSITION],
                 name=f"{name}_encoder",
             )
-        else:
-            # create lambda so that it can be used later without the check
-            self._tf_layers[f"{name}_transformer"] = lambda x, mask, training: x
 
     def _prepare_mask_lm_layers(self, name: Text) -> None:
         self._tf_layers[f"{name}_input_mask"] = layers.InputMask()
@@ -1361,13 +1394,17 @@ class DIET(RasaModel):
             transformer_inputs = inputs
             lm_mask_bool = None
 
-        outputs = self._tf_layers[f"{name}_transformer"](
-            transformer_inputs, 1 - mask, self._training
-        )
-
         if self.config[NUM_TRANSFORMER_LAYERS] > 0:
+            import tensorflow_addons as tfa
+
+            # the inverted mask is only needed by the transformer
+            outputs = self._tf_layers[f"{name}_transformer"](
+                transformer_inputs, 1 - mask, self._training
+            )
             # apply activation
             outputs = tfa.activations.gelu(outputs)
+        else:
+            outputs = transformer_inputs
 
         return outputs, inputs, seq_ids, lm_mask_bool
 
@@ -1389,10 +1426,13 @@ class DIET(RasaModel):
     @staticmethod
     def _last_token(x: tf.Tensor, sequence_lengths: tf.Tensor) -> tf.Tensor:
         last_sequence_index = tf.maximum(0, sequence_lengths - 1)
-        batch_index = tf.range(tf.shape(last_sequence_index)[0])
+        batch_size = tf.shape(x)[0]
+        max_seq_len = tf.shape(x)[1]
 
-        indices = tf.stack([batch_index, last_sequence_index], axis=1)
-        return tf.gather_nd(x, indices)
+        # gather from the flattened sequences to avoid building nd indices
+        flat_x = tf.reshape(x, (-1, x.shape[-1]))
+        indices = tf.range(batch_size) * max_seq_len + last_sequence_index
+        return tf.gather(flat_x, indices)
 
     def _mask_loss(
         self,
@@ -1402,18 +1442,21 @@ class DIET(RasaModel):
         lm_mask_bool: tf.Tensor,
         name: Text,
     ) -> tf.Tensor:
-        # make sure there is at least one element in the mask
-        lm_mask_bool = tf.cond(
-            tf.reduce_any(lm_mask_bool),
-            lambda: lm_mask_bool,
-            lambda: tf.scatter_nd([[0, 0, 0]], [True], tf.shape(lm_mask_bool)),
+        # make sure there is at least one element in the mask,
+        # without a conditional, so that the graph has no control flow here
+        first_element = tf.scatter_nd([[0, 0, 0]], [True], tf.shape(lm_mask_bool))
+        lm_mask_bool = tf.logical_or(
+            lm_mask_bool,
+            tf.logical_and(tf.logical_not(tf.reduce_any(lm_mask_bool)), first_element),
         )
 
         lm_mask_bool = tf.squeeze(lm_mask_bool, -1)
-        # pick elements that were masked
-        outputs = tf.boolean_mask(outputs, lm_mask_bool)
-        inputs = tf.boolean_mask(inputs, lm_mask_bool)
-        ids = tf.boolean_mask(seq_ids, lm_mask_bool)
+        # pick elements that were masked,
+        # the indices are shared by all tensors, so compute them only once
+        masked_indices = tf.where(lm_mask_bool)
+        outputs = tf.gather_nd(outputs, masked_indices)
+        inputs = tf.gather_nd(inputs, masked_indices)
+        ids = tf.gather_nd(seq_ids, masked_indices)
 
         outputs_embed = self._tf_layers[f"embed.{name}_lm_mask"](outputs)
         inputs_embed = self._tf_layers[f"embed.{name}_golden_token"](inputs)
@@ -1597,6 +1640,17 @@ class DIET(RasaModel):
             self.entity_role_loss.update_state(loss)
             self.entity_role_f1.update_state(f1)
 
+    def build_for_predict(
+        self, predict_data: RasaModelData, eager: bool = False
+    ) -> None:
+        if self.config[INTENT_CLASSIFICATION]:
+            # label embeddings don't depend on the message, so compute them once
+            # instead of inside every call of the prediction graph
+            self._training = False
+            _, self.all_labels_embed = self._create_all_labels()
+
+        super().build_for_predict(predict_data, eager)
+
     def batch_predict(
         self, batch_in: Union[Tuple[tf.Tensor], Tuple[np.ndarray]]
     ) -> Dict[Text, tf.Tensor]:
@@ -1630,6 +1684,8 @@ class DIET(RasaModel):
     ) -> Dict[Text, tf.Tensor]:
         predictions: Dict[Text, tf.Tensor] = {}
 
+        sequence_lengths -= 1  # remove cls token
+
         entity_tags = None
 
         for tag_spec in self._entity_tag_specs:
@@ -1645,7 +1701,7 @@ class DIET(RasaModel):
                 _input = tf.concat([_input, _tags], axis=-1)
 
             _logits = self._tf_layers[f"embed.{name}.logits"](_input)
-            pred_ids = self._tf_layers[f"crf.{name}"](_logits, sequence_lengths - 1)
+            pred_ids = self._tf_layers[f"crf.{name}"](_logits, sequence_lengths)
 
             predictions[f"e_{name}_ids"] = pred_ids
 
@@ -130,6 +130,7 @@ class EntityExtractor(Component):
             Entities.
         """
         entities = []
+        tag_names = list(tags.keys())
 
         last_entity_tag = NO_ENTITY_TAG
         last_role_tag = NO_ENTITY_TAG
@@ -153,7 +154,7 @@ class EntityExtractor(Component):
 
             if new_tag_found:
                 entity = self._create_new_entity(
-                    list(tags.keys()),
+                    tag_names,
                     current_entity_tag,
                     current_group_tag,
                     current_role_tag,
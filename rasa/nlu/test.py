@@ -881,13 +881,43 @@ def determine_token_labels(
         entity type
     """
 
+    return determine_labels_for_tokens([token], entities, extractors, attribute_key)[0]
+
+
+def determine_labels_for_tokens(
+    tokens: List[Token],
+    entities: List[Dict],
+    extractors: Optional[Set[Text]] = None,
+    attribute_key: Text = ENTITY_ATTRIBUTE_TYPE,
+) -> List[Text]:
+    """
+    Determines the token labels for the provided attribute key of all tokens of a
+    message given entities that do not overlap.
+
+    The overlap of the entities is checked only once for all tokens.
+
+    Args:
+        tokens: the tokens of a message
+        entities: entities found by a single extractor
+        extractors: list of extractors
+        attribute_key: the attribute key for which the entity type should be returned
+    Returns:
+        entity type of every token
+    """
+
+    if not tokens:
+        return []
     if entities is None or len(entities) == 0:
-        return NO_ENTITY_TAG
+        return [NO_ENTITY_TAG for _ in tokens]
     if not do_extractors_support_overlap(extractors) and do_entities_overlap(entities):
         raise ValueError("The possible entities should not overlap")
 
-    candidates = find_intersecting_entites(token, entities)
-    return pick_best_entity_fit(token, candidates, attribute_key)
+    return [
+        pick_best_entity_fit(
+            token, find_intersecting_entites(token, entities), attribute_key
+        )
+        for token in tokens
+    ]
 
 
 def do_extractors_support_overlap(extractors: Optional[Set[Text]]) -> bool:
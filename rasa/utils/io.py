@@ -164,7 +164,9 @@ def pickle_dump(filename: Union[Text, Path], obj: Any) -> None:
         obj: the object to store
     """
     with open(filename, "wb") as f:
-        pickle.dump(obj, f)
+        # protocol 4 is the highest one supported by all python versions we
+        # support, so that persisted models stay loadable on each of them
+        pickle.dump(obj, f, protocol=4)
 
 
 def pickle_load(filename: Union[Text, Path]) -> Any:
@@ -7,6 +7,7 @@ from rasa.constants import (
     ENV_GPU_CONFIG,
     ENV_CPU_INTER_OP_CONFIG,
     ENV_CPU_INTRA_OP_CONFIG,
+    ENV_XLA_JIT_CONFIG,
 )
 
 if typing.TYPE_CHECKING:
@@ -14,6 +15,10 @@ if typing.TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# environment variable and flag TensorFlow reads to enable XLA on the CPU
+ENV_XLA_FLAGS = "TF_XLA_FLAGS"
+XLA_CPU_GLOBAL_JIT_FLAG = "--tf_xla_cpu_global_jit"
+
 
 def _setup_gpu_environment() -> None:
     """Set configuration for TensorFlow GPU environment based on the environment variable set."""
@@ -135,8 +140,53 @@ def _setup_cpu_environment() -> None:
         tf_config.threading.set_intra_op_parallelism_threads(intra_op_parallel_threads)
 
 
+def _parse_xla_jit_config(xla_jit_config: Text) -> bool:
+    """Parse XLA configuration variable from a string to a boolean.
+
+    Args:
+        xla_jit_config: String containing the configuration for XLA compilation.
+
+    Returns:
+        `True` if XLA compilation was requested, `False` otherwise.
+    """
+
+    xla_jit_config = xla_jit_config.strip().lower()
+
+    if xla_jit_config in ["true", "1"]:
+        return True
+    if xla_jit_config in ["false", "0"]:
+        return False
+
+    raise ValueError(
+        f"Error parsing the environment variable '{ENV_XLA_JIT_CONFIG}'. Please "
+        f"set it to 'True' or 'False'."
+    )
+
+
+def _setup_xla_environment() -> None:
+    """Enable XLA compilation of TensorFlow graphs if the environment variable is set."""
+
+    xla_jit_config = os.getenv(ENV_XLA_JIT_CONFIG)
+
+    if not xla_jit_config or not _parse_xla_jit_config(xla_jit_config):
+        return
+
+    # TensorFlow only auto-clusters ops placed on the CPU if this flag is set,
+    # it is read once the first graph gets optimized
+    xla_flags = os.getenv(ENV_XLA_FLAGS, "").split()
+    if XLA_CPU_GLOBAL_JIT_FLAG not in xla_flags:
+        os.environ[ENV_XLA_FLAGS] = " ".join(xla_flags + [XLA_CPU_GLOBAL_JIT_FLAG])
+
+    from tensorflow import config as tf_config
+
+    # let XLA cluster and fuse the supported ops of the traced train and
+    # predict functions, unsupported ops keep running as regular TF kernels
+    tf_config.optimizer.set_jit(True)
+
+
 def setup_tf_environment() -> None:
-    """Setup CPU and GPU related environment settings for TensorFlow."""
+    """Setup CPU, GPU and XLA related environment settings for TensorFlow."""
 
     _setup_cpu_environment()
     _setup_gpu_environment()
+    _setup_xla_environment()
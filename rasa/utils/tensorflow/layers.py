@@ -1,7 +1,6 @@
 import logging
 from typing import List, Optional, Text, Tuple, Callable, Union, Any
 import tensorflow as tf
-import tensorflow_addons as tfa
 from tensorflow.python.keras.utils import tf_utils
 from tensorflow.python.keras import backend as K
 from rasa.utils.tensorflow.constants import SOFTMAX, MARGIN, COSINE, INNER
@@ -237,6 +236,8 @@ class Ffnn(tf.keras.layers.Layer):
         sparsity: float,
         layer_name_suffix: Text,
     ) -> None:
+        import tensorflow_addons as tfa
+
         super().__init__(name=f"ffnn_{layer_name_suffix}")
 
         l2_regularizer = tf.keras.regularizers.l2(reg_lambda)
@@ -425,6 +426,45 @@ def _scale_loss(log_likelihood: tf.Tensor) -> tf.Tensor:
     )
 
 
+class MicroF1Score(tf.keras.metrics.Metric):
+    """Micro averaged F1 score computed directly from class ids.
+
+    Negative ids are not considered to be a class, e.g. a negative
+    prediction is not a prediction.
+
+    Arguments:
+        name: Optional name of the metric.
+    """
+
+    def __init__(self, name: Text = "micro_f1_score", **kwargs: Any) -> None:
+        super().__init__(name=name, **kwargs)
+        self.true_positives = self.add_weight("true_positives", initializer="zeros")
+        self.false_positives = self.add_weight("false_positives", initializer="zeros")
+        self.false_negatives = self.add_weight("false_negatives", initializer="zeros")
+
+    # noinspection PyMethodOverriding
+    def update_state(self, y_true: tf.Tensor, y_pred: tf.Tensor) -> None:
+        is_true = y_true >= 0
+        is_pred = y_pred >= 0
+        is_wrong = tf.not_equal(y_true, y_pred)
+
+        def _count(x: tf.Tensor) -> tf.Tensor:
+            return tf.reduce_sum(tf.cast(x, self.dtype))
+
+        self.true_positives.assign_add(
+            _count(tf.logical_and(is_true, tf.logical_not(is_wrong)))
+        )
+        self.false_positives.assign_add(_count(tf.logical_and(is_pred, is_wrong)))
+        self.false_negatives.assign_add(_count(tf.logical_and(is_true, is_wrong)))
+
+    def result(self) -> tf.Tensor:
+        # equal to the harmonic mean of micro precision and recall
+        return tf.math.divide_no_nan(
+            2 * self.true_positives,
+            2 * self.true_positives + self.false_positives + self.false_negatives,
+        )
+
+
 class CRF(tf.keras.layers.Layer):
     """CRF layer.
 
@@ -445,10 +485,7 @@ class CRF(tf.keras.layers.Layer):
         self.num_tags = num_tags
         self.scale_loss = scale_loss
         self.transition_regularizer = tf.keras.regularizers.l2(reg_lambda)
-        self.f1_score_metric = tfa.metrics.F1Score(
-            num_classes=num_tags - 1,  # `0` prediction is not a prediction
-            average="micro",
-        )
+        self.f1_score_metric = MicroF1Score()
 
     def build(self, input_shape: tf.TensorShape) -> None:
         # the weights should be created in `build` to apply random_seed
@@ -472,6 +509,8 @@ class CRF(tf.keras.layers.Layer):
             A [batch_size, max_seq_len] matrix, with dtype `tf.int32`.
             Contains the highest scoring tag indices.
         """
+        import tensorflow_addons as tfa
+
         pred_ids, _ = tfa.text.crf.crf_decode(
             logits, self.transition_params, sequence_lengths
         )
@@ -498,6 +537,7 @@ class CRF(tf.keras.layers.Layer):
             Negative mean log-likelihood of all examples,
             given the sequence of tag indices.
         """
+        import tensorflow_addons as tfa
 
         log_likelihood, _ = tfa.text.crf.crf_log_likelihood(
             logits, tag_indices, sequence_lengths, self.transition_params
@@ -516,16 +556,12 @@ class CRF(tf.keras.layers.Layer):
         mask_bool = tf.cast(mask[:, :, 0], tf.bool)
 
         # pick only non padding values and flatten sequences
-        tag_ids_flat = tf.boolean_mask(tag_ids, mask_bool)
-        pred_ids_flat = tf.boolean_mask(pred_ids, mask_bool)
+        non_padding_indices = tf.where(mask_bool)
+        tag_ids_flat = tf.gather_nd(tag_ids, non_padding_indices)
+        pred_ids_flat = tf.gather_nd(pred_ids, non_padding_indices)
 
         # set `0` prediction to not a prediction
-        num_tags = self.num_tags - 1
-
-        tag_ids_flat_one_hot = tf.one_hot(tag_ids_flat - 1, num_tags)
-        pred_ids_flat_one_hot = tf.one_hot(pred_ids_flat - 1, num_tags)
-
-        return self.f1_score_metric(tag_ids_flat_one_hot, pred_ids_flat_one_hot)
+        return self.f1_score_metric(tag_ids_flat - 1, pred_ids_flat - 1)
 
 
 class DotProductLoss(tf.keras.layers.Layer):
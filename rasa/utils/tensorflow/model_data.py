@@ -217,6 +217,20 @@ class RasaModelData:
             for key, values in self.data.items()
         }
 
+    def get_tensor_specs(
+        self, batch_size: Optional[int] = None
+    ) -> Tuple[tf.TensorSpec, ...]:
+        """Get tensor specs of the batches created by `prepare_batch`.
+
+        The specs can be used as an input signature of a `tf.function`
+        without building a `tf.data.Dataset`. If `batch_size` is given,
+        the batch dimension of dense features is fixed to it.
+        """
+
+        shapes, types = self._get_shapes_types(batch_size)
+
+        return tuple(tf.TensorSpec(shape, dtype) for shape, dtype in zip(shapes, types))
+
     def as_tf_dataset(
         self, batch_size: int, batch_strategy: Text = SEQUENCE, shuffle: bool = False
     ) -> tf.data.Dataset:
@@ -224,13 +238,16 @@ class RasaModelData:
 
         shapes, types = self._get_shapes_types()
 
-        return tf.data.Dataset.from_generator(
+        dataset = tf.data.Dataset.from_generator(
             lambda batch_size_: self._gen_batch(batch_size_, batch_strategy, shuffle),
             output_types=types,
             output_shapes=shapes,
             args=([batch_size]),
         )
 
+        # prepare the next batches while the model is busy with the current one
+        return dataset.prefetch(tf.data.experimental.AUTOTUNE)
+
     def prepare_batch(
         self,
         data: Optional[Data] = None,
@@ -272,7 +289,7 @@ class RasaModelData:
         # len of batch_data is equal to the number of keys in model data
         return tuple(batch_data)
 
-    def _get_shapes_types(self) -> Tuple:
+    def _get_shapes_types(self, batch_size: Optional[int] = None) -> Tuple:
         """Extract shapes and types from model data."""
 
         types = []
@@ -285,11 +302,11 @@ class RasaModelData:
                 shapes.append((None,))
                 shapes.append((features[0].ndim + 1))
             elif features[0].ndim == 0:
-                shapes.append((None,))
+                shapes.append((batch_size,))
             elif features[0].ndim == 1:
-                shapes.append((None, features[0].shape[-1]))
+                shapes.append((batch_size, features[0].shape[-1]))
             else:
-                shapes.append((None, None, features[0].shape[-1]))
+                shapes.append((batch_size, None, features[0].shape[-1]))
 
         def append_type(features: np.ndarray) -> None:
             if isinstance(features[0], scipy.sparse.spmatrix):
@@ -548,35 +565,35 @@ class RasaModelData:
         data_size = len(array_of_dense)
         max_seq_len = max([x.shape[0] for x in array_of_dense])
 
+        # allocate the padded batch in its final type, so that the data is
+        # converted while being copied instead of copying it a second time
         data_padded = np.zeros(
-            [data_size, max_seq_len, array_of_dense[0].shape[-1]],
-            dtype=array_of_dense[0].dtype,
+            [data_size, max_seq_len, array_of_dense[0].shape[-1]], dtype=np.float32
         )
         for i in range(data_size):
             data_padded[i, : array_of_dense[i].shape[0], :] = array_of_dense[i]
 
-        return data_padded.astype(np.float32)
+        return data_padded
 
     @staticmethod
     def _scipy_matrix_to_values(array_of_sparse: np.ndarray) -> List[np.ndarray]:
         """Convert a scipy matrix into indices, data, and shape."""
 
-        # we need to make sure that the matrices are coo_matrices otherwise the
-        # transformation does not work (e.g. you cannot access x.row, x.col)
-        if not isinstance(array_of_sparse[0], scipy.sparse.coo_matrix):
-            array_of_sparse = [x.tocoo() for x in array_of_sparse]
+        seq_lens = np.array([x.shape[0] for x in array_of_sparse])
+        max_seq_len = seq_lens.max()
 
-        max_seq_len = max([x.shape[0] for x in array_of_sparse])
+        # stack all matrices into one coo matrix instead of converting and
+        # iterating over every (small) matrix separately
+        stacked = scipy.sparse.vstack(list(array_of_sparse), format="coo")
 
-        # get the indices of values
-        indices = np.hstack(
-            [
-                np.vstack([i * np.ones_like(x.row), x.row, x.col])
-                for i, x in enumerate(array_of_sparse)
-            ]
-        ).T
+        # map the rows of the stacked matrix back to example and sequence index
+        row_offsets = np.concatenate([[0], np.cumsum(seq_lens)])
+        example_ids = np.searchsorted(row_offsets, stacked.row, side="right") - 1
+        indices = np.stack(
+            [example_ids, stacked.row - row_offsets[example_ids], stacked.col], axis=1
+        )
 
-        data = np.hstack([x.data for x in array_of_sparse])
+        data = stacked.data
 
         number_of_features = array_of_sparse[0].shape[-1]
         shape = np.array((len(array_of_sparse), max_seq_len, number_of_features))
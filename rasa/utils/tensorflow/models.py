@@ -223,8 +223,10 @@ class RasaModel(tf.keras.models.Model):
         self, predict_data: RasaModelData, eager: bool = False
     ) -> None:
         self._training = False  # needed for tf graph mode
+        # prediction is always done on a single example,
+        # so the batch dimension of the graph can be fixed
         self._predict_function = self._get_tf_call_model_function(
-            predict_data.as_tf_dataset, self.batch_predict, eager, "prediction"
+            predict_data, self.batch_predict, eager, "prediction", batch_size=1
         )
 
     def predict(self, predict_data: RasaModelData) -> Dict[Text, tf.Tensor]:
@@ -248,17 +250,14 @@ class RasaModel(tf.keras.models.Model):
         logger.debug("Loading the model ...")
         # create empty model
         model = cls(*args, **kwargs)
-        # need to train on 1 example to build weights of the correct size
-        model.fit(
-            model_data_example,
-            epochs=1,
-            batch_size=1,
-            evaluate_every_num_epochs=0,
-            evaluate_on_num_examples=0,
-            batch_strategy=SEQUENCE,
-            silent=True,  # don't confuse users with training output
-            eager=True,  # no need to build tf graph, eager is faster here
+        # need to train on 1 example to build weights of the correct size,
+        # a single eager step is enough, so no dataset or tf graph is created
+        batch_in = tuple(
+            tf.constant(x) for x in model_data_example.prepare_batch(start=0, end=1)
         )
+        model._training = True  # needed for eager mode
+        model.train_on_batch(batch_in)
+        model._training = None  # phase should be defined when building a graph
         # load trained weights
         model.load_weights(model_file_name)
 
@@ -305,23 +304,32 @@ class RasaModel(tf.keras.models.Model):
 
     @staticmethod
     def _get_tf_call_model_function(
-        dataset_function: Callable,
+        model_data: RasaModelData,
         call_model_function: Callable,
         eager: bool,
         phase: Text,
+        batch_size: Optional[int] = None,
     ) -> Callable:
-        """Convert functions to tensorflow functions"""
+        """Convert functions to tensorflow functions.
+
+        The input signature is taken directly from the model data,
+        so no `tf.data.Dataset` needs to be created to build the graph.
+        Sequence lengths are left dynamic, so the graph is not retraced
+        for inputs of different lengths.
+        """
 
         if eager:
             return call_model_function
 
         logger.debug(f"Building tensorflow {phase} graph...")
 
-        init_dataset = dataset_function(1)
         tf_call_model_function = tf.function(
-            call_model_function, input_signature=[init_dataset.element_spec]
+            call_model_function,
+            input_signature=[model_data.get_tensor_specs(batch_size)],
         )
-        tf_call_model_function(next(iter(init_dataset)))
+        # tracing the input signature is enough to build the graph,
+        # no batch needs to be created and run through the model
+        tf_call_model_function.get_concrete_function()
 
         logger.debug(f"Finished building tensorflow {phase} graph.")
 
@@ -339,7 +347,7 @@ class RasaModel(tf.keras.models.Model):
         return (
             train_dataset_function,
             self._get_tf_call_model_function(
-                train_dataset_function, self.train_on_batch, eager, "train"
+                model_data, self.train_on_batch, eager, "train"
             ),
         )
 
@@ -360,7 +368,7 @@ class RasaModel(tf.keras.models.Model):
         return (
             evaluation_dataset_function,
             self._get_tf_call_model_function(
-                evaluation_dataset_function, self._total_batch_loss, eager, "evaluation"
+                evaluation_model_data, self._total_batch_loss, eager, "evaluation"
             ),
         )
 
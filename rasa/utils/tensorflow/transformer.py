@@ -1,6 +1,5 @@
 from typing import List, Optional, Text, Tuple, Union
 import tensorflow as tf
-import tensorflow_addons as tfa
 from tensorflow.python.keras.utils import tf_utils
 from tensorflow.python.keras import backend as K
 import numpy as np
@@ -420,6 +419,8 @@ class TransformerEncoderLayer(tf.keras.layers.Layer):
         max_relative_position: Optional[int] = None,
         heads_share_relative_embedding: bool = False,
     ) -> None:
+        import tensorflow_addons as tfa
+
         super().__init__()
 
         self._layer_norm = tf.keras.layers.LayerNormalization(epsilon=1e-6)
@@ -53,8 +53,9 @@ def normalize(values: np.ndarray, ranking_length: Optional[int] = 0) -> np.ndarr
 
     new_values = values.copy()  # prevent mutation of the input
     if 0 < ranking_length < len(new_values):
-        ranked = sorted(new_values, reverse=True)
-        new_values[new_values < ranked[ranking_length - 1]] = 0
+        # the `ranking_length`-th largest value, found without a full sort
+        threshold = np.partition(new_values, -ranking_length)[-ranking_length]
+        new_values[new_values < threshold] = 0
 
     if np.sum(new_values) > 0:
         new_values = new_values / np.sum(new_values)
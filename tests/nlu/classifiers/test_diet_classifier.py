@@ -1,12 +1,20 @@
 import numpy as np
 import pytest
+import tensorflow as tf
 
 from unittest.mock import Mock
 
 from rasa.nlu import train
 from rasa.nlu.classifiers import LABEL_RANKING_LENGTH
 from rasa.nlu.config import RasaNLUModelConfig
-from rasa.nlu.constants import TEXT, SPARSE_FEATURE_NAMES, DENSE_FEATURE_NAMES, INTENT
+from rasa.nlu.constants import (
+    TEXT,
+    SPARSE_FEATURE_NAMES,
+    DENSE_FEATURE_NAMES,
+    INTENT,
+    ENTITIES,
+    TOKENS_NAMES,
+)
 from rasa.utils.tensorflow.constants import (
     LOSS_TYPE,
     RANDOM_SEED,
@@ -19,8 +27,9 @@ from rasa.utils.tensorflow.constants import (
     EVAL_NUM_EXAMPLES,
     BILOU_FLAG,
 )
-from rasa.nlu.classifiers.diet_classifier import DIETClassifier
+from rasa.nlu.classifiers.diet_classifier import DIETClassifier, EntityTagSpec
 from rasa.nlu.model import Interpreter
+from rasa.nlu.tokenizers.tokenizer import Token
 from rasa.nlu.training_data import Message
 from rasa.utils import train_utils
 from tests.nlu.conftest import DEFAULT_DATA_PATH
@@ -86,6 +95,76 @@ def test_check_labels_features_exist(messages, expected):
     assert DIETClassifier._check_labels_features_exist(messages, attribute) == expected
 
 
+def test_first_example_per_label():
+    examples = [
+        Message("hello", data={INTENT: "greet"}),
+        Message("bye", data={INTENT: "goodbye"}),
+        Message("hi", data={INTENT: "greet"}),
+    ]
+
+    label_examples = DIETClassifier._first_example_per_label(examples, INTENT)
+
+    assert set(label_examples.keys()) == {"greet", "goodbye"}
+    assert label_examples["greet"] is examples[0]
+    assert label_examples["goodbye"] is examples[1]
+
+
+def _entity_tag_spec() -> EntityTagSpec:
+    tags_to_ids = {"O": 0, "city": 1, "cuisine": 2}
+    return EntityTagSpec(
+        tag_name="entity",
+        ids_to_tags={value: key for key, value in tags_to_ids.items()},
+        tags_to_ids=tags_to_ids,
+        num_tags=len(tags_to_ids),
+    )
+
+
+def _entity_message(entities) -> Message:
+    text = "italian food in new york"
+    tokens = [
+        Token("italian", 0),
+        Token("food", 8),
+        Token("in", 13),
+        Token("new", 16),
+        Token("york", 20),
+    ]
+    return Message(text, data={ENTITIES: entities, TOKENS_NAMES[TEXT]: tokens})
+
+
+@pytest.mark.parametrize(
+    "entities, expected_tag_ids",
+    [
+        (
+            [
+                {"start": 0, "end": 7, "value": "italian", "entity": "cuisine"},
+                {"start": 16, "end": 24, "value": "new york", "entity": "city"},
+            ],
+            [2, 0, 0, 1, 1],
+        ),
+        ([], [0, 0, 0, 0, 0]),
+    ],
+)
+def test_tag_ids_for_crf(entities, expected_tag_ids):
+    classifier = DIETClassifier(component_config={BILOU_FLAG: False, EPOCHS: 1})
+
+    tag_ids = classifier._tag_ids_for_crf(_entity_message(entities), _entity_tag_spec())
+
+    assert tag_ids.dtype == np.int64
+    assert tag_ids.shape == (len(expected_tag_ids), 1)
+    assert tag_ids[:, 0].tolist() == expected_tag_ids
+
+
+def test_tag_ids_for_crf_raises_on_overlapping_entities():
+    classifier = DIETClassifier(component_config={BILOU_FLAG: False, EPOCHS: 1})
+    entities = [
+        {"start": 16, "end": 24, "value": "new york", "entity": "city"},
+        {"start": 20, "end": 24, "value": "york", "entity": "cuisine"},
+    ]
+
+    with pytest.raises(ValueError):
+        classifier._tag_ids_for_crf(_entity_message(entities), _entity_tag_spec())
+
+
 @pytest.mark.parametrize(
     "pipeline",
     [
@@ -231,6 +310,37 @@ async def test_softmax_normalization(
     assert parse_data.get("intent") == intent_ranking[0]
 
 
+@pytest.mark.parametrize(
+    "ranking_length, expected_label_ids, expected_confidences",
+    [
+        # fewer labels reported than available
+        (3, [1, 3, 4], [0.4 / 0.85, 0.3 / 0.85, 0.15 / 0.85]),
+        # more labels requested than available
+        (8, [1, 3, 4, 0, 2], [0.4, 0.3, 0.15, 0.1, 0.05]),
+    ],
+)
+def test_predict_label_ranking(
+    ranking_length, expected_label_ids, expected_confidences
+):
+    similarities = [0.1, 0.4, 0.05, 0.3, 0.15]
+    classifier = DIETClassifier(
+        component_config={RANKING_LENGTH: ranking_length, EPOCHS: 1},
+        index_label_id_mapping={i: f"label_{i}" for i in range(len(similarities))},
+    )
+
+    label, label_ranking = classifier._predict_label(
+        {"i_scores": tf.constant([similarities])}
+    )
+
+    assert [l["name"] for l in label_ranking] == [
+        f"label_{i}" for i in expected_label_ids
+    ]
+    assert [l["confidence"] for l in label_ranking] == pytest.approx(
+        expected_confidences
+    )
+    assert label == label_ranking[0]
+
+
 @pytest.mark.parametrize(
     "classifier_params, output_length",
     [({LOSS_TYPE: "margin", RANDOM_SEED: 42, EPOCHS: 1}, LABEL_RANKING_LENGTH)],
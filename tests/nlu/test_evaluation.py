@@ -42,7 +42,9 @@ from rasa.nlu.test import does_token_cross_borders
 from rasa.nlu.test import align_entity_predictions
 from rasa.nlu.test import determine_intersection
 from rasa.nlu.test import determine_token_labels
+from rasa.nlu.test import determine_labels_for_tokens
 from rasa.nlu.config import RasaNLUModelConfig
+from rasa.nlu.constants import NO_ENTITY_TAG
 from rasa.nlu.tokenizers.tokenizer import Token
 import json
 import os
@@ -237,6 +239,17 @@ def test_determine_token_labels_with_extractors():
     )
 
 
+@pytest.mark.parametrize("tokens", [None, []])
+def test_determine_labels_for_tokens_without_tokens(tokens):
+    assert determine_labels_for_tokens(tokens, EN_targets) == []
+
+
+def test_determine_labels_for_tokens_without_entities():
+    assert determine_labels_for_tokens(CH_correct_segmentation, []) == [
+        NO_ENTITY_TAG for _ in CH_correct_segmentation
+    ]
+
+
 def test_label_merging():
     aligned_predictions = [
         {
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from rasa.utils.tensorflow.layers import MicroF1Score
+
+
+@pytest.mark.parametrize(
+    "y_true, y_pred, expected_f1_score",
+    [
+        # 1 true positive, 2 false positives, 2 false negatives
+        ([0, 1, -1, 2, -1], [0, -1, 1, 1, -1], 2 / 6),
+        ([0, 1, 2], [0, 1, 2], 1.0),
+        ([0, 1], [1, 0], 0.0),
+        # neither a class nor a prediction
+        ([-1, -1], [-1, -1], 0.0),
+    ],
+)
+def test_micro_f1_score(y_true, y_pred, expected_f1_score):
+    metric = MicroF1Score()
+
+    metric.update_state(np.array(y_true), np.array(y_pred))
+
+    assert metric.result().numpy() == pytest.approx(expected_f1_score)
+
+
+def test_micro_f1_score_accumulates_state():
+    metric = MicroF1Score()
+
+    metric.update_state(np.array([0, 1, -1, 2, -1]), np.array([0, -1, 1, 1, -1]))
+    metric.update_state(np.array([1, 1]), np.array([1, 1]))
+
+    # 3 true positives, 2 false positives, 2 false negatives
+    assert metric.result().numpy() == pytest.approx(6 / 10)
+
+    metric.reset_states()
+
+    assert metric.result().numpy() == 0.0
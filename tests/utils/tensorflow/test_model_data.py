@@ -1,8 +1,10 @@
 import copy
+from typing import Optional
 
 import pytest
 import scipy.sparse
 import numpy as np
+import tensorflow as tf
 
 from rasa.utils.tensorflow.model_data import RasaModelData
 
@@ -169,6 +171,76 @@ def test_gen_batch(model_data: RasaModelData):
         next(iterator)
 
 
+def test_scipy_matrix_to_values():
+    # coo matrix with entries that are not sorted by row
+    unsorted_coo = scipy.sparse.coo_matrix(
+        ([1.0, 2.0, 3.0], ([2, 0, 1], [3, 1, 0])), shape=(3, 4)
+    )
+    matrices = [
+        scipy.sparse.csr_matrix(np.array([[0, 1, 0, 2], [3, 0, 0, 0]])),
+        scipy.sparse.csr_matrix((0, 4)),
+        unsorted_coo,
+        scipy.sparse.coo_matrix(np.array([[0, 0, 5, 0]])),
+        scipy.sparse.csr_matrix((0, 4)),
+    ]
+    array_of_sparse = np.empty(len(matrices), dtype=object)
+    array_of_sparse[:] = matrices
+
+    indices, data, shape = RasaModelData._scipy_matrix_to_values(array_of_sparse)
+
+    # convert every matrix on its own to compare with
+    coo_matrices = [x.tocoo() for x in matrices]
+    expected_indices = np.hstack(
+        [
+            np.vstack([i * np.ones_like(x.row), x.row, x.col])
+            for i, x in enumerate(coo_matrices)
+        ]
+    ).T
+    expected_data = np.hstack([x.data for x in coo_matrices])
+
+    assert indices.dtype == np.int64
+    assert data.dtype == np.float32
+    assert shape.dtype == np.int64
+    assert np.array_equal(indices, expected_indices)
+    assert np.array_equal(data, expected_data)
+    assert np.array_equal(shape, [5, 3, 4])
+
+
+@pytest.mark.parametrize("batch_size", [None, 1])
+def test_get_tensor_specs(model_data: RasaModelData, batch_size: Optional[int]):
+    specs = model_data.get_tensor_specs(batch_size)
+
+    assert [spec.shape.as_list() for spec in specs] == [
+        # dense sequence features
+        [batch_size, None, 14],
+        # sparse features are converted into indices, values and shape,
+        # which are never batched
+        [None, 3],
+        [None],
+        [3],
+        [batch_size, None, 10],
+        # scalar label ids
+        [batch_size],
+        [batch_size, None, 1],
+    ]
+    assert [spec.dtype for spec in specs] == [
+        tf.float32,
+        tf.int64,
+        tf.float32,
+        tf.int64,
+        tf.float32,
+        tf.float32,
+        tf.float32,
+    ]
+
+    # the specs describe the batches created by `prepare_batch`
+    batch = model_data.prepare_batch(start=0, end=1)
+    assert all(
+        spec.is_compatible_with(tf.constant(tensor))
+        for spec, tensor in zip(specs, batch)
+    )
+
+
 def test_balance_model_data(model_data: RasaModelData):
     data = model_data._balanced_data(model_data.data, 2, False)
 
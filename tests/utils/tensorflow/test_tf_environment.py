@@ -1,6 +1,18 @@
+import os
+
 import pytest
-from typing import Text, Dict
-from rasa.utils.tensorflow.environment import _parse_gpu_config
+import tensorflow as tf
+from typing import Text, Dict, Optional
+from _pytest.monkeypatch import MonkeyPatch
+
+from rasa.constants import ENV_XLA_JIT_CONFIG
+from rasa.utils.tensorflow.environment import (
+    _parse_gpu_config,
+    _parse_xla_jit_config,
+    _setup_xla_environment,
+    ENV_XLA_FLAGS,
+    XLA_CPU_GLOBAL_JIT_FLAG,
+)
 
 
 @pytest.mark.parametrize(
@@ -9,3 +21,54 @@ from rasa.utils.tensorflow.environment import _parse_gpu_config
 )
 def test_gpu_config_parser(gpu_config_string: Text, parsed_gpu_config: Dict[int, int]):
     assert _parse_gpu_config(gpu_config_string) == parsed_gpu_config
+
+
+@pytest.mark.parametrize(
+    "xla_jit_config_string, parsed_xla_jit_config",
+    [("True", True), (" true ", True), ("1", True), ("False", False), ("0", False)],
+)
+def test_xla_jit_config_parser(
+    xla_jit_config_string: Text, parsed_xla_jit_config: bool
+):
+    assert _parse_xla_jit_config(xla_jit_config_string) == parsed_xla_jit_config
+
+
+def test_xla_jit_config_parser_raises_on_invalid_value():
+    with pytest.raises(ValueError):
+        _parse_xla_jit_config("yes please")
+
+
+@pytest.mark.parametrize(
+    "xla_flags, expected_xla_flags",
+    [
+        (None, XLA_CPU_GLOBAL_JIT_FLAG),
+        ("--tf_xla_auto_jit=2", f"--tf_xla_auto_jit=2 {XLA_CPU_GLOBAL_JIT_FLAG}"),
+        (XLA_CPU_GLOBAL_JIT_FLAG, XLA_CPU_GLOBAL_JIT_FLAG),
+    ],
+)
+def test_setup_xla_environment(
+    monkeypatch: MonkeyPatch, xla_flags: Optional[Text], expected_xla_flags: Text
+):
+    monkeypatch.setenv(ENV_XLA_JIT_CONFIG, "True")
+    if xla_flags is None:
+        monkeypatch.delenv(ENV_XLA_FLAGS, raising=False)
+    else:
+        monkeypatch.setenv(ENV_XLA_FLAGS, xla_flags)
+
+    try:
+        _setup_xla_environment()
+
+        assert tf.config.optimizer.get_jit()
+        assert os.environ[ENV_XLA_FLAGS] == expected_xla_flags
+    finally:
+        tf.config.optimizer.set_jit(False)
+
+
+def test_setup_xla_environment_disabled(monkeypatch: MonkeyPatch):
+    monkeypatch.setenv(ENV_XLA_JIT_CONFIG, "False")
+    monkeypatch.delenv(ENV_XLA_FLAGS, raising=False)
+
+    _setup_xla_environment()
+
+    assert not tf.config.optimizer.get_jit()
+    assert ENV_XLA_FLAGS not in os.environ
@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 import rasa.utils.train_utils as train_utils
 from rasa.nlu.constants import NUMBER_OF_SUB_TOKENS
@@ -26,3 +27,21 @@ def test_align_token_features_convert():
     assert np.all(actual_features[0][3] == np.mean(token_features[0][3:5], axis=0))
     # embedding is split into 4 sub-tokens
     assert np.all(actual_features[0][4] == np.mean(token_features[0][5:10], axis=0))
+
+
+@pytest.mark.parametrize(
+    "ranking_length, expected",
+    [
+        (2, [0.0, 0.5 / 0.7, 0.2 / 0.7, 0.0, 0.0]),
+        (0, [0.1, 0.5, 0.2, 0.15, 0.05]),
+        (5, [0.1, 0.5, 0.2, 0.15, 0.05]),
+    ],
+)
+def test_normalize(ranking_length, expected):
+    values = np.array([0.1, 0.5, 0.2, 0.15, 0.05])
+
+    normalized = train_utils.normalize(values, ranking_length)
+
+    assert np.allclose(normalized, expected)
+    # the input is not modified
+    assert np.allclose(values, [0.1, 0.5, 0.2, 0.15, 0.05])